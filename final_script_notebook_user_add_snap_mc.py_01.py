@@ -57,8 +57,19 @@ def create_user(workspace_url, access_token, user):
         print(f"Error creating user {user['userName']}: {e}")
         return False
 
+def get_transfer_format(object_type):
+    """Pick the export/import format for a workspace object type."""
+    # Notebooks keep their language via SOURCE, workspace files are copied as-is via AUTO
+    return "SOURCE" if object_type == "NOTEBOOK" else "AUTO"
+
+def encode_content(content):
+    """Base64-encode text or binary content for the import API."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return base64.b64encode(content).decode("utf-8")
+
 def list_notebooks(workspace_url, access_token, path="/"):
-    """Recursively list all notebooks, Python files, and directories in a Databricks workspace."""
+    """Recursively list all notebooks, files, and directories in a Databricks workspace."""
     api_endpoint = f"{workspace_url}/api/2.0/workspace/list"
     params = {"path": path}
     notebooks = []
@@ -69,8 +80,12 @@ def list_notebooks(workspace_url, access_token, path="/"):
         objects = response.json().get("objects", [])
 
         for obj in objects:
-            if obj["object_type"] == "NOTEBOOK" or (obj["object_type"] == "FILE" and obj["path"].endswith('.py')):
-                notebooks.append(obj["path"])
+            if obj["object_type"] in ("NOTEBOOK", "FILE"):
+                notebooks.append({
+                    "path": obj["path"],
+                    "object_type": obj["object_type"],
+                    "language": obj.get("language"),
+                })
             elif obj["object_type"] == "DIRECTORY":
                 directories.add(obj["path"])
                 sub_notebooks, sub_dirs = list_notebooks(workspace_url, access_token, obj["path"])
@@ -82,25 +97,22 @@ def list_notebooks(workspace_url, access_token, path="/"):
         print(f"Error listing notebooks in {path}: {e}")
         return [], set()
 
-def export_notebook(workspace_url, access_token, notebook_path):
-    """Export a notebook or Python file from a Databricks workspace and decode the base64 content."""
+def export_notebook(workspace_url, access_token, notebook_path, object_type="NOTEBOOK"):
+    """Export a notebook or file from a Databricks workspace and decode the base64 content."""
     api_endpoint = f"{workspace_url}/api/2.0/workspace/export"
-    
-    # Determine the format based on the file extension
-    if notebook_path.endswith('.py'):
-        format_type = "SOURCE"
-    else:
-        format_type = "SOURCE"  # Default for notebooks
-
-    params = {"path": notebook_path, "format": format_type}
+    params = {"path": notebook_path, "format": get_transfer_format(object_type)}
 
     try:
         response = requests.get(api_endpoint, headers=get_headers(access_token), params=params)
         response.raise_for_status()
         content = response.json().get("content", "")
 
-        # Decode the base64-encoded content
-        return base64.b64decode(content).decode("utf-8")
+        # Decode the base64-encoded content, keeping binary files as raw bytes
+        content = base64.b64decode(content)
+        try:
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
+            return content
     except requests.exceptions.RequestException as e:
         print(f"Error exporting notebook {notebook_path}: {e}")
         return None
@@ -117,29 +129,21 @@ def create_directory(workspace_url, access_token, directory_path):
     except requests.exceptions.RequestException as e:
         print(f"Error creating directory {directory_path}: {e}")
 
-def import_notebook(workspace_url, access_token, notebook_path, content):
-    """Import a notebook or Python file into a Databricks workspace."""
+def import_notebook(workspace_url, access_token, notebook_path, content, language=None, object_type="NOTEBOOK"):
+    """Import a notebook or file into a Databricks workspace, preserving its language and format."""
     api_endpoint = f"{workspace_url}/api/2.0/workspace/import"
 
-    # Encode the notebook content to base64
-    content_encoded = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-
-    # Determine the format based on the file extension
-    if notebook_path.endswith('.py'):
-        format_type = "SOURCE"
-        language = "PYTHON"
-    else:
-        format_type = "SOURCE"  # Default for notebooks
-        language = "PYTHON"    # Or the appropriate language
-
     data = {
         "path": notebook_path,
-        "format": format_type,
-        "content": content_encoded,
-        "overwrite": True,
-        "language": language
+        "format": get_transfer_format(object_type),
+        "content": encode_content(content),
+        "overwrite": True
     }
 
+    # Only notebooks carry a language; files are imported as-is
+    if object_type == "NOTEBOOK":
+        data["language"] = language or "PYTHON"
+
     try:
         response = requests.post(api_endpoint, headers=get_headers(access_token), json=data)
         response.raise_for_status()
@@ -176,9 +180,9 @@ def transfer_users_and_notebooks(source_workspace, target_workspace):
 
     # Transfer notebooks and directories
     print(f"Listing all notebooks and directories in {source_workspace}...")
-    notebook_paths, directory_paths = list_notebooks(source_config["url"], source_config["token"])
+    notebooks, directory_paths = list_notebooks(source_config["url"], source_config["token"])
 
-    print(f"Found {len(directory_paths)} directories and {len(notebook_paths)} notebooks.")
+    print(f"Found {len(directory_paths)} directories and {len(notebooks)} notebooks.")
 
     # Create directories first to maintain structure
     for directory in sorted(directory_paths):
@@ -186,17 +190,23 @@ def transfer_users_and_notebooks(source_workspace, target_workspace):
         create_directory(target_config["url"], target_config["token"], directory)
 
     # Transfer notebooks
-    for notebook_path in notebook_paths:
+    for notebook in notebooks:
+        notebook_path = notebook["path"]
         print(f"Processing notebook: {notebook_path}")
 
-        notebook_content = export_notebook(source_config["url"], source_config["token"], notebook_path)
-        if not notebook_content:
+        notebook_content = export_notebook(
+            source_config["url"], source_config["token"], notebook_path, notebook["object_type"]
+        )
+        if notebook_content is None:
             print(f"Skipping notebook {notebook_path} due to export error.")
             continue
 
         # Import to the same path in the target workspace
         print(f"Importing notebook to {target_workspace}: {notebook_path}")
-        if not import_notebook(target_config["url"], target_config["token"], notebook_path, notebook_content):
+        if not import_notebook(
+            target_config["url"], target_config["token"], notebook_path, notebook_content,
+            notebook["language"], notebook["object_type"]
+        ):
             print(f"Failed to import notebook: {notebook_path}")
 
     print("User and notebook transfer completed.")
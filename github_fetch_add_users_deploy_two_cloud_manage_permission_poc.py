@@ -1,4 +1,5 @@
 import os
+import time
 import requests
 import base64
 from dotenv import load_dotenv
@@ -25,6 +26,15 @@ WORKSPACE_CONFIG = {
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_REPO_OWNER = os.getenv("GITHUB_REPO_OWNER")
 GITHUB_REPO_NAME = os.getenv("GITHUB_REPO_NAME")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "main")
+
+# Seconds between head commit polls in watch mode
+WATCH_INTERVAL = int(os.getenv("WATCH_INTERVAL", "10"))
+# Failed deploys are retried with exponential backoff, up to WATCH_MAX_RETRIES times per head commit
+WATCH_MAX_RETRIES = int(os.getenv("WATCH_MAX_RETRIES", "5"))
+WATCH_MAX_BACKOFF = int(os.getenv("WATCH_MAX_BACKOFF", "600"))
+# The compare API lists at most 300 changed files; larger diffs fall back to a full deploy
+GITHUB_COMPARE_FILE_LIMIT = 300
 
 # Load users and their permissions from .env
 USERS = os.getenv("USERS")
@@ -41,6 +51,23 @@ else:
         "samir.shinde@digivatelabs.com": "CAN_MANAGE"
     }
 
+# Deploy layout: "PER_USER" imports every file into each user's directory,
+# "SHARED" imports every file once into SHARED_DIRECTORY and grants users access to it.
+# SHARED_DIRECTORY is required in SHARED mode. Everything under /Shared is readable by all
+# workspace users, so point it outside /Shared if access must be limited to USERS.
+# Users get SHARED_PERMISSION_LEVEL on the shared copy so no single user can change or delete it.
+DEPLOY_MODE = os.getenv("DEPLOY_MODE", "PER_USER").upper()
+SHARED_DIRECTORY = os.getenv("SHARED_DIRECTORY")
+SHARED_PERMISSION_LEVEL = os.getenv("SHARED_PERMISSION_LEVEL", "CAN_RUN")
+
+# Notebook languages inferred from GitHub file extensions; anything else is imported as a workspace file
+NOTEBOOK_LANGUAGES = {
+    ".py": "PYTHON",
+    ".sql": "SQL",
+    ".scala": "SCALA",
+    ".r": "R",
+}
+
 
 def get_headers(token):
     return {
@@ -53,22 +80,35 @@ def get_workspace_config(cloud_provider):
     return WORKSPACE_CONFIG.get(cloud_provider.upper(), None)
 
 
-def fetch_notebook_from_github(repo_owner, repo_name, notebook_path, github_token):
+def fetch_notebook_from_github(repo_owner, repo_name, notebook_path, github_token, ref=None):
     """
-    Fetch a notebook from GitHub using the GitHub API.
+    Fetch a notebook from GitHub using the GitHub API, optionally at a specific commit.
     """
     api_endpoint = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{notebook_path}"
     headers = {
         "Authorization": f"token {github_token}",
         "Accept": "application/vnd.github.v3+json"
     }
+    params = {"ref": ref} if ref else None
     try:
-        response = requests.get(api_endpoint, headers=headers)
+        response = requests.get(api_endpoint, headers=headers, params=params)
         response.raise_for_status()
-        content = response.json().get("content")
-        if content:
-            # Decode base64 content
-            return base64.b64decode(content).decode("utf-8")
+        body = response.json()
+        content = body.get("content")
+        if body.get("encoding") == "none":
+            # Files over 1 MB come back without content; fetch them through the raw media type instead
+            headers["Accept"] = "application/vnd.github.raw+json"
+            response = requests.get(api_endpoint, headers=headers, params=params)
+            response.raise_for_status()
+            content = response.content
+        elif content is not None:
+            content = base64.b64decode(content)
+        if content is not None:
+            # Keep binary files as raw bytes
+            try:
+                return content.decode("utf-8")
+            except UnicodeDecodeError:
+                return content
         else:
             print(f"Notebook {notebook_path} not found in GitHub repository.")
             return None
@@ -77,49 +117,172 @@ def fetch_notebook_from_github(repo_owner, repo_name, notebook_path, github_toke
         return None
 
 
-def fetch_all_files_from_github(repo_owner, repo_name, github_token, path=""):
+def fetch_all_files_from_github(repo_owner, repo_name, github_token, path="", ref=None, failed_paths=None):
     """
-    Fetch all files from a GitHub repository or a specific directory.
+    Fetch all files from a GitHub repository or a specific directory, optionally at a specific commit.
+    Paths of files and directories that could not be fetched are appended to failed_paths if given.
     """
     api_endpoint = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{path}"
     headers = {
         "Authorization": f"token {github_token}",
         "Accept": "application/vnd.github.v3+json"
     }
+    params = {"ref": ref} if ref else None
     try:
-        response = requests.get(api_endpoint, headers=headers)
+        response = requests.get(api_endpoint, headers=headers, params=params)
         response.raise_for_status()
         files = response.json()
         
         file_contents = {}
         for file in files:
             if file["type"] == "file":  # Fetch all files, not just .py files
-                file_content = fetch_notebook_from_github(repo_owner, repo_name, file["path"], github_token)
-                if file_content:
+                file_content = fetch_notebook_from_github(repo_owner, repo_name, file["path"], github_token, ref)
+                if file_content is not None:
                     file_contents[file["name"]] = file_content
+                elif failed_paths is not None:
+                    failed_paths.append(file["path"])
             elif file["type"] == "dir":  # Recursively fetch files from subdirectories
-                subdir_files = fetch_all_files_from_github(repo_owner, repo_name, github_token, file["path"])
+                subdir_files = fetch_all_files_from_github(
+                    repo_owner, repo_name, github_token, file["path"], ref, failed_paths
+                )
                 file_contents.update(subdir_files)
         
         return file_contents
     except requests.exceptions.RequestException as e:
         print(f"Error fetching files from GitHub repository: {e}")
+        if failed_paths is not None:
+            failed_paths.append(path or "/")
         return {}
 
 
-def import_notebook(workspace_url, access_token, content, notebook_name, workspace_dir):
+def get_head_commit(repo_owner, repo_name, branch, github_token, etag=None):
+    """
+    Fetch the head commit SHA of a branch with a conditional request.
+    Returns (sha, etag); sha is None when the head has not changed since etag.
+    Unchanged (304) responses do not count against the GitHub rate limit.
+    """
+    api_endpoint = f"https://api.github.com/repos/{repo_owner}/{repo_name}/commits/{branch}"
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.sha"
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        response = requests.get(api_endpoint, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return response.text.strip(), response.headers.get("ETag")
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching head commit of {branch} from GitHub: {e}")
+        return None, etag
+
+
+def fetch_changed_files(repo_owner, repo_name, base_sha, head_sha, github_token):
+    """
+    List the files changed between two commits.
+    Returns a list of {"filename", "status", "previous_filename"} or None if the diff cannot be listed fully.
+    """
+    api_endpoint = f"https://api.github.com/repos/{repo_owner}/{repo_name}/compare/{base_sha}...{head_sha}"
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    try:
+        response = requests.get(api_endpoint, headers=headers)
+        response.raise_for_status()
+        comparison = response.json()
+        # A diverged or behind head (e.g. after a force-push) is not described by the merge-base diff
+        if comparison.get("status") in ("diverged", "behind"):
+            print(f"Head {head_sha} has {comparison['status']} from {base_sha}.")
+            return None
+        files = comparison.get("files", [])
+        if len(files) >= GITHUB_COMPARE_FILE_LIMIT:
+            print(f"Diff between {base_sha} and {head_sha} is too large to list.")
+            return None
+        return [
+            {
+                "filename": file["filename"],
+                "status": file["status"],
+                "previous_filename": file.get("previous_filename"),
+            }
+            for file in files
+        ]
+    except requests.exceptions.RequestException as e:
+        print(f"Error comparing {base_sha}...{head_sha} on GitHub: {e}")
+        return None
+
+
+def fetch_repo_paths(repo_owner, repo_name, ref, github_token):
+    """
+    List every file path in the repository at a commit, or None if the tree cannot be fetched fully.
+    """
+    api_endpoint = f"https://api.github.com/repos/{repo_owner}/{repo_name}/git/trees/{ref}"
+    headers = {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    try:
+        response = requests.get(api_endpoint, headers=headers, params={"recursive": "1"})
+        response.raise_for_status()
+        tree = response.json()
+        if tree.get("truncated"):
+            print(f"Repository tree at {ref} is too large to list.")
+            return None
+        return {entry["path"] for entry in tree.get("tree", []) if entry["type"] == "blob"}
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching repository tree at {ref} from GitHub: {e}")
+        return None
+
+
+def encode_content(content):
+    """
+    Base64-encode text or binary file content for the workspace import API.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return base64.b64encode(content).decode("utf-8")
+
+
+def infer_import_format(file_name):
+    """
+    Infer the import format and notebook language from a file extension.
+    Returns (format, language); language is None for non-source notebooks and files.
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension in NOTEBOOK_LANGUAGES:
+        return "SOURCE", NOTEBOOK_LANGUAGES[extension]
+    if extension == ".ipynb":
+        return "JUPYTER", None
+    return "AUTO", None
+
+
+def encode_all_files(all_files):
+    """
+    Base64-encode every file once so the payloads can be reused across imports.
+    """
+    return {file_name: encode_content(file_content) for file_name, file_content in all_files.items()}
+
+
+def import_notebook(workspace_url, access_token, content, notebook_name, workspace_dir, encoded_content=None):
     """
     Import a notebook into a Databricks workspace.
+    If encoded_content is given, it is sent as-is instead of re-encoding content.
     """
     api_endpoint = f"{workspace_url}/api/2.0/workspace/import"
     notebook_path = f"{workspace_dir}/{notebook_name}"
+    if encoded_content is None:
+        encoded_content = encode_content(content)
+    import_format, language = infer_import_format(notebook_name)
     data = {
         "path": notebook_path,
-        "format": "SOURCE",
-        "language": "PYTHON",
-        "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
+        "format": import_format,
+        "content": encoded_content,
         "overwrite": True
     }
+    if language:
+        data["language"] = language
     try:
         response = requests.post(api_endpoint, headers=get_headers(access_token), json=data)
         response.raise_for_status()
@@ -130,6 +293,26 @@ def import_notebook(workspace_url, access_token, content, notebook_name, workspa
         return None
 
 
+def delete_object(workspace_url, access_token, path):
+    """
+    Delete a notebook or file from a Databricks workspace.
+    An object that does not exist counts as deleted, so retried deletes succeed.
+    """
+    api_endpoint = f"{workspace_url}/api/2.0/workspace/delete"
+    data = {"path": path}
+    try:
+        response = requests.post(api_endpoint, headers=get_headers(access_token), json=data)
+        if response.status_code == 404 or "RESOURCE_DOES_NOT_EXIST" in response.text:
+            print(f"{path} does not exist in {workspace_url}, nothing to delete")
+            return True
+        response.raise_for_status()
+        print(f"Deleted {path} from {workspace_url}")
+        return True
+    except requests.exceptions.RequestException as e:
+        print(f"Error deleting {path} from {workspace_url}: {e}")
+        return False
+
+
 def get_object_status(workspace_url, access_token, path):
     """
     Fetch the status of an object (notebook or directory) in a Databricks workspace.
@@ -200,11 +383,28 @@ def create_directory(workspace_url, access_token, path):
         return False
 
 
-def grant_permissions(workspace_url, access_token, path, user, permission_level, cluster_id):
+def get_directory_id(workspace_url, access_token, path):
+    """
+    Resolve the numeric object_id of a workspace directory, as required by the Permissions API.
+    """
+    status = get_object_status(workspace_url, access_token, path)
+    if not status or status.get("object_type") != "DIRECTORY":
+        print(f"Could not resolve directory id for {path} in {workspace_url}")
+        return None
+    return status.get("object_id")
+
+
+def grant_permissions(workspace_url, access_token, path, user, permission_level, cluster_id, directory_id=None):
     """
     Grant permissions to a user for a specific path in the Databricks workspace.
+    The directory id is looked up from the path unless it is passed in.
     """
-    api_endpoint = f"{workspace_url}/api/2.0/permissions/directories/{path}"
+    if directory_id is None:
+        directory_id = get_directory_id(workspace_url, access_token, path)
+        if directory_id is None:
+            print(f"Error granting permissions to {user} for {path}: directory not found")
+            return False
+    api_endpoint = f"{workspace_url}/api/2.0/permissions/directories/{directory_id}"
     data = {
         "access_control_list": [
             {
@@ -223,36 +423,289 @@ def grant_permissions(workspace_url, access_token, path, user, permission_level,
         return False
 
 
+def ensure_user_exists(workspace_url, access_token, user):
+    """
+    Make sure a user exists in the workspace, adding them if necessary.
+    """
+    if check_user_exists(workspace_url, access_token, user):
+        return True
+    print(f"User {user} does not exist in the workspace. Adding user...")
+    return add_user_to_workspace(workspace_url, access_token, user)
+
+
+def import_encoded_files(workspace_url, access_token, encoded_files, target_directory):
+    """
+    Import pre-encoded files into a directory in the workspace.
+    Returns True if every file was imported.
+    """
+    print(f"Importing files to {target_directory} in workspace...")
+    success = True
+    for file_name, encoded_content in encoded_files.items():
+        target_file_path = import_notebook(
+            workspace_url, access_token, None, file_name, target_directory, encoded_content=encoded_content
+        )
+        if not target_file_path:
+            print(f"Failed to import {file_name} into {target_directory}.")
+            success = False
+    return success
+
+
 def deploy_to_workspace(workspace_url, access_token, all_files, workspace_dir):
     """
-    Deploy all files to a specific workspace.
+    Deploy all files to a specific workspace, one copy per user directory.
+    Returns True if every user was deployed without errors.
     """
+    # Encode every file once and reuse the payloads for each user
+    encoded_files = encode_all_files(all_files)
+    success = True
+
     for user, permission_level in USERS.items():
         print(f"Processing user: {user}")
 
         # Check if the user exists in the workspace
-        if not check_user_exists(workspace_url, access_token, user):
-            print(f"User {user} does not exist in the workspace. Adding user...")
-            if not add_user_to_workspace(workspace_url, access_token, user):
-                print(f"Failed to add user {user}. Skipping.")
-                continue
+        if not ensure_user_exists(workspace_url, access_token, user):
+            print(f"Failed to add user {user}. Skipping.")
+            success = False
+            continue
 
         # Create a directory for the user if it doesn't exist
         user_directory = f"{workspace_dir}/{user}"
         if not create_directory(workspace_url, access_token, user_directory):
             print(f"Failed to create directory for user {user}. Skipping.")
+            success = False
             continue
 
         # Import all files into the user's directory in the workspace
-        print(f"Importing files to {user_directory} in workspace...")
-        for file_name, file_content in all_files.items():
-            target_file_path = import_notebook(workspace_url, access_token, file_content, file_name, user_directory)
-            if not target_file_path:
-                print(f"Failed to import {file_name} into {user_directory}.")
+        if not import_encoded_files(workspace_url, access_token, encoded_files, user_directory):
+            success = False
 
         # Grant permissions to the user for their directory
         print(f"Granting permissions to {user} for {user_directory}...")
-        grant_permissions(workspace_url, access_token, user_directory, user, permission_level, None)
+        if not grant_permissions(workspace_url, access_token, user_directory, user, permission_level, None):
+            success = False
+
+    return success
+
+
+def deploy_to_shared_folder(workspace_url, access_token, all_files, shared_dir):
+    """
+    Deploy all files once to a shared directory and grant each user access to it.
+    Returns True if the files were imported and every user was granted access.
+    """
+    encoded_files = encode_all_files(all_files)
+
+    # Import the content a single time into the shared directory
+    if not create_directory(workspace_url, access_token, shared_dir):
+        print(f"Failed to create shared directory {shared_dir}. Exiting.")
+        return False
+    success = import_encoded_files(workspace_url, access_token, encoded_files, shared_dir)
+
+    if shared_dir == "/Shared" or shared_dir.startswith("/Shared/"):
+        print(f"Warning: {shared_dir} is under /Shared and is accessible to all workspace users.")
+
+    # Resolve the directory id once and reuse it for every grant
+    directory_id = get_directory_id(workspace_url, access_token, shared_dir)
+    if directory_id is None:
+        print(f"Failed to resolve shared directory {shared_dir}. Permissions were not granted.")
+        return False
+
+    # Grant each user read/run access to the shared directory
+    failed_users = []
+    for user in USERS:
+        print(f"Processing user: {user}")
+
+        if not ensure_user_exists(workspace_url, access_token, user):
+            print(f"Failed to add user {user}. Skipping.")
+            failed_users.append(user)
+            continue
+
+        print(f"Granting permissions to {user} for {shared_dir}...")
+        if not grant_permissions(
+            workspace_url, access_token, shared_dir, user, SHARED_PERMISSION_LEVEL, None, directory_id=directory_id
+        ):
+            failed_users.append(user)
+
+    if failed_users:
+        print(f"Failed to grant access to {shared_dir} for: {', '.join(failed_users)}")
+        return False
+    return success
+
+
+def check_deploy_config():
+    """
+    Check that the configured DEPLOY_MODE has the settings it needs.
+    """
+    if DEPLOY_MODE == "SHARED" and not SHARED_DIRECTORY:
+        print("SHARED_DIRECTORY must be set when DEPLOY_MODE is SHARED.")
+        return False
+    return True
+
+
+def deploy_files(workspace_url, access_token, all_files):
+    """
+    Deploy all files to a workspace using the configured DEPLOY_MODE.
+    Returns True if the deploy completed without errors.
+    """
+    if not check_deploy_config():
+        return False
+    if DEPLOY_MODE == "SHARED":
+        return deploy_to_shared_folder(workspace_url, access_token, all_files, SHARED_DIRECTORY)
+    return deploy_to_workspace(workspace_url, access_token, all_files, "/Users")
+
+
+def get_deploy_directories():
+    """
+    Return the workspace directories that hold deployed files for the configured DEPLOY_MODE.
+    """
+    if DEPLOY_MODE == "SHARED":
+        return [SHARED_DIRECTORY]
+    return [f"/Users/{user}" for user in USERS]
+
+
+def deploy_changed_files(target_configs, changed_files, head_sha):
+    """
+    Push only the files changed in a commit range to every target workspace and deploy directory.
+    Files are deployed by name, matching the flat layout of a full deploy.
+    Returns True if every changed file was fetched, imported or deleted.
+    """
+    updated_files = {}
+    removed_names = set()
+    for change in changed_files:
+        if change["status"] == "removed":
+            removed_names.add(os.path.basename(change["filename"]))
+            continue
+        if change["status"] == "renamed" and change["previous_filename"]:
+            removed_names.add(os.path.basename(change["previous_filename"]))
+        content = fetch_notebook_from_github(
+            GITHUB_REPO_OWNER, GITHUB_REPO_NAME, change["filename"], GITHUB_TOKEN, ref=head_sha
+        )
+        if content is None:
+            print(f"Failed to fetch {change['filename']} at {head_sha}.")
+            return False
+        updated_files[os.path.basename(change["filename"])] = content
+    removed_names -= set(updated_files)
+
+    # Only delete a name when no file with that name is left in the repository at head
+    if removed_names:
+        repo_paths = fetch_repo_paths(GITHUB_REPO_OWNER, GITHUB_REPO_NAME, head_sha, GITHUB_TOKEN)
+        if repo_paths is None:
+            return False
+        removed_names -= {os.path.basename(path) for path in repo_paths}
+
+    # Encode each changed file once and reuse it for every workspace and directory
+    encoded_files = encode_all_files(updated_files)
+    success = True
+    for cloud, config in target_configs.items():
+        print(f"Deploying {len(encoded_files)} changed and {len(removed_names)} removed files to {cloud}...")
+        for directory in get_deploy_directories():
+            if not import_encoded_files(config["url"], config["token"], encoded_files, directory):
+                success = False
+            for file_name in removed_names:
+                if not delete_object(config["url"], config["token"], f"{directory}/{file_name}"):
+                    success = False
+    return success
+
+
+def deploy_full_tree(target_configs, head_sha, file_cache=None):
+    """
+    Fetch every file at a commit and deploy it to every target workspace.
+    A complete fetch is kept in file_cache so a retried deploy does not fetch the repository again.
+    Returns True if every file was fetched and every deploy succeeded.
+    """
+    if file_cache is not None and head_sha in file_cache:
+        all_files = file_cache[head_sha]
+    else:
+        failed_paths = []
+        all_files = fetch_all_files_from_github(
+            GITHUB_REPO_OWNER, GITHUB_REPO_NAME, GITHUB_TOKEN, ref=head_sha, failed_paths=failed_paths
+        )
+        if failed_paths:
+            print(f"Failed to fetch {len(failed_paths)} paths from GitHub repository: {', '.join(failed_paths)}")
+            return False
+        if not all_files:
+            print("Failed to fetch files from GitHub repository.")
+            return False
+        if file_cache is not None:
+            file_cache.clear()
+            file_cache[head_sha] = all_files
+
+    success = True
+    for config in target_configs.values():
+        if not deploy_files(config["url"], config["token"], all_files):
+            success = False
+    return success
+
+
+def deploy_commit(target_configs, deployed_sha, head_sha, file_cache):
+    """
+    Bring every target workspace from deployed_sha to head_sha.
+    Deploys the full tree when nothing is deployed yet or the diff cannot be listed.
+    Returns True if the deploy succeeded.
+    """
+    if deployed_sha is None:
+        # Start from a full deploy so every target matches the current head
+        print(f"Deploying {GITHUB_BRANCH}@{head_sha} to {', '.join(target_configs)}...")
+        return deploy_full_tree(target_configs, head_sha, file_cache)
+
+    print(f"New commit detected: {deployed_sha} -> {head_sha}")
+    changed_files = fetch_changed_files(GITHUB_REPO_OWNER, GITHUB_REPO_NAME, deployed_sha, head_sha, GITHUB_TOKEN)
+    if changed_files is None:
+        print("Falling back to a full deploy...")
+        return deploy_full_tree(target_configs, head_sha, file_cache)
+    return deploy_changed_files(target_configs, changed_files, head_sha)
+
+
+def watch_and_deploy(target_clouds, interval=WATCH_INTERVAL):
+    """
+    Poll the GitHub branch head and deploy only changed files whenever a new commit lands.
+    A commit counts as deployed only once every fetch and import for it succeeded.
+    Failed deploys are retried with exponential backoff and given up after WATCH_MAX_RETRIES,
+    until the next commit lands; that commit's diff still starts from the last deployed commit.
+    """
+    target_configs = {}
+    for cloud in target_clouds:
+        config = get_workspace_config(cloud)
+        if not config:
+            print(f"Invalid target cloud provider: {cloud}")
+            return
+        target_configs[cloud.upper()] = config
+
+    if not check_deploy_config():
+        return
+
+    deployed_sha = None
+    latest_sha = None
+    etag = None
+    failed_attempts = 0
+    retry_at = 0
+    file_cache = {}
+    print(f"Watching {GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}@{GITHUB_BRANCH} every {interval}s. Press Ctrl+C to stop.")
+    try:
+        while True:
+            # The ETag is kept while backing off, so polling stays a free 304 until the head moves
+            head_sha, etag = get_head_commit(GITHUB_REPO_OWNER, GITHUB_REPO_NAME, GITHUB_BRANCH, GITHUB_TOKEN, etag)
+            if head_sha and head_sha != latest_sha:
+                latest_sha = head_sha
+                failed_attempts = 0
+                retry_at = 0
+
+            pending = latest_sha and latest_sha != deployed_sha
+            if pending and failed_attempts <= WATCH_MAX_RETRIES and time.time() >= retry_at:
+                if deploy_commit(target_configs, deployed_sha, latest_sha, file_cache):
+                    deployed_sha = latest_sha
+                    failed_attempts = 0
+                    file_cache.clear()
+                else:
+                    failed_attempts += 1
+                    if failed_attempts > WATCH_MAX_RETRIES:
+                        print(f"Giving up on {latest_sha} after {WATCH_MAX_RETRIES} retries until a new commit lands.")
+                    else:
+                        delay = min(interval * 2 ** failed_attempts, WATCH_MAX_BACKOFF)
+                        retry_at = time.time() + delay
+                        print(f"Deploy of {latest_sha} did not complete. Retrying in {delay}s.")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Watch mode stopped.")
 
 
 def sync_to_source_workspace(source_cloud, git_url=None, cluster_id=None):
@@ -273,7 +726,7 @@ def sync_to_source_workspace(source_cloud, git_url=None, cluster_id=None):
 
     # Deploy to source workspace
     print(f"Deploying to source workspace: {source_cloud}")
-    deploy_to_workspace(source_config["url"], source_config["token"], all_files, "/Users")
+    deploy_files(source_config["url"], source_config["token"], all_files)
 
     print("Notebook synchronization and permission sync completed for source workspace.")
 
@@ -296,19 +749,24 @@ def sync_to_destination_workspace(target_cloud, git_url=None, cluster_id=None):
 
     # Deploy to target workspace
     print(f"Deploying to target workspace: {target_cloud}")
-    deploy_to_workspace(target_config["url"], target_config["token"], all_files, "/Users")
+    deploy_files(target_config["url"], target_config["token"], all_files)
 
     print("Notebook synchronization and permission sync completed for destination workspace.")
 
 
 if __name__ == "__main__":
-    # Step 1: Ask for source workspace and sync
-    source_cloud = input("Enter source cloud provider (AWS/AZURE/GCP): ")
-    git_url = input("Enter Git repository URL (optional): ")
-    cluster_id = input("Enter cluster ID for attach permissions (optional): ")
-
-    sync_to_source_workspace(source_cloud, git_url, cluster_id)
-
-    # Step 2: Ask for destination workspace and sync
-    target_cloud = input("Enter target cloud provider (AWS/AZURE/GCP): ")
-    sync_to_destination_workspace(target_cloud, git_url, cluster_id)
\ No newline at end of file
+    # Optionally keep running and deploy each new commit as it lands
+    if input("Run in watch mode? (y/N): ").strip().lower() == "y":
+        target_clouds = input("Enter target cloud providers, comma-separated (AWS/AZURE/GCP): ")
+        watch_and_deploy([cloud.strip() for cloud in target_clouds.split(",") if cloud.strip()])
+    else:
+        # Step 1: Ask for source workspace and sync
+        source_cloud = input("Enter source cloud provider (AWS/AZURE/GCP): ")
+        git_url = input("Enter Git repository URL (optional): ")
+        cluster_id = input("Enter cluster ID for attach permissions (optional): ")
+
+        sync_to_source_workspace(source_cloud, git_url, cluster_id)
+
+        # Step 2: Ask for destination workspace and sync
+        target_cloud = input("Enter target cloud provider (AWS/AZURE/GCP): ")
+        sync_to_destination_workspace(target_cloud, git_url, cluster_id)
\ No newline at end of file
@@ -31,20 +31,37 @@ def get_headers(token):
     }
 
 
+def get_transfer_format(object_type):
+    """Pick the export/import format for a workspace object type."""
+    # Notebooks keep their language via SOURCE, workspace files are copied as-is via AUTO
+    return "SOURCE" if object_type == "NOTEBOOK" else "AUTO"
+
+
+def encode_content(content):
+    """Base64-encode text or binary content for the import API."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return base64.b64encode(content).decode("utf-8")
+
+
 def list_notebooks(workspace_url, access_token, path="/"):
-    """Fetch all notebook paths from the source workspace."""
+    """Fetch all notebooks and files, with their object type and language, from the source workspace."""
     api_endpoint = f"{workspace_url}/api/2.0/workspace/list"
     try:
         response = requests.get(api_endpoint, headers=get_headers(access_token), params={"path": path})
         response.raise_for_status()
         objects = response.json().get("objects", [])
 
-        # Collect all notebook paths
+        # Collect all notebooks and files together with their metadata
         notebooks = []
         for obj in objects:
             obj_path = obj["path"]
-            if obj.get("object_type") == "NOTEBOOK":
-                notebooks.append(obj_path)
+            if obj.get("object_type") in ("NOTEBOOK", "FILE"):
+                notebooks.append({
+                    "path": obj_path,
+                    "object_type": obj["object_type"],
+                    "language": obj.get("language"),
+                })
             elif obj.get("object_type") == "DIRECTORY":
                 # Recursively fetch notebooks inside directories
                 notebooks.extend(list_notebooks(workspace_url, access_token, obj_path))
@@ -55,33 +72,40 @@ def list_notebooks(workspace_url, access_token, path="/"):
         return []
 
 
-def export_notebook(workspace_url, access_token, path):
-    """Export a notebook from a workspace."""
+def export_notebook(workspace_url, access_token, path, object_type="NOTEBOOK"):
+    """Export a notebook or file from a workspace."""
     api_endpoint = f"{workspace_url}/api/2.0/workspace/export"
+    params = {"path": path, "format": get_transfer_format(object_type)}
     try:
-        response = requests.get(api_endpoint, headers=get_headers(access_token), params={"path": path, "format": "SOURCE"})
+        response = requests.get(api_endpoint, headers=get_headers(access_token), params=params)
         response.raise_for_status()
-        return base64.b64decode(response.json()["content"]).decode("utf-8")
+        content = base64.b64decode(response.json()["content"])
+        try:
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
+            # Binary workspace files are transferred as raw bytes
+            return content
     except requests.exceptions.RequestException as e:
         print(f"Error exporting notebook {path} from {workspace_url}: {e}")
         return None
 
 
-def import_notebook(workspace_url, access_token, content, path, language='PYTHON'):
-    """Import a notebook into a workspace."""
-    existing_content = export_notebook(workspace_url, access_token, path)
-    if existing_content and existing_content == content:
+def import_notebook(workspace_url, access_token, content, path, language='PYTHON', object_type="NOTEBOOK"):
+    """Import a notebook or file into a workspace, preserving its language and format."""
+    existing_content = export_notebook(workspace_url, access_token, path, object_type)
+    if existing_content is not None and existing_content == content:
         print(f"Notebook {path} already up-to-date in {workspace_url}")
         return
 
     api_endpoint = f"{workspace_url}/api/2.0/workspace/import"
     data = {
         "path": path,
-        "format": "SOURCE",
-        "language": language,
-        "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
+        "format": get_transfer_format(object_type),
+        "content": encode_content(content),
         "overwrite": True
     }
+    if object_type == "NOTEBOOK":
+        data["language"] = language or "PYTHON"
     try:
         response = requests.post(api_endpoint, headers=get_headers(access_token), json=data)
         response.raise_for_status()
@@ -103,17 +127,20 @@ def sync_notebooks(source_cloud, target_cloud):
         return
 
     # Fetch all notebooks dynamically from the source workspace
-    notebook_paths = list_notebooks(source_config["url"], source_config["token"])
+    notebooks = list_notebooks(source_config["url"], source_config["token"])
 
-    if not notebook_paths:
+    if not notebooks:
         print(f"No notebooks found in {source_cloud} workspace.")
         return
 
-    # Sync notebooks
-    for notebook_path in notebook_paths:
-        content = export_notebook(source_config["url"], source_config["token"], notebook_path)
-        if content:
-            import_notebook(target_config["url"], target_config["token"], content, notebook_path)
+    # Sync notebooks, keeping each object's type and language
+    for notebook in notebooks:
+        content = export_notebook(source_config["url"], source_config["token"], notebook["path"], notebook["object_type"])
+        if content is not None:
+            import_notebook(
+                target_config["url"], target_config["token"], content, notebook["path"],
+                notebook["language"], notebook["object_type"]
+            )
 
     print(f"Notebook synchronization from {source_cloud} to {target_cloud} completed.")
 
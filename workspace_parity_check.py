@@ -0,0 +1,422 @@
+import os
+import time
+import json
+import hashlib
+import requests
+import base64
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Configuration from .env
+WORKSPACE_CONFIG = {
+    "AWS": {
+        "url": os.getenv("AWS_WORKSPACE_URL"),
+        "token": os.getenv("AWS_ACCESS_TOKEN"),
+    },
+    "AZURE": {
+        "url": os.getenv("AZURE_WORKSPACE_URL"),
+        "token": os.getenv("AZURE_ACCESS_TOKEN"),
+    },
+    "GCP": {
+        "url": os.getenv("GCP_WORKSPACE_URL"),
+        "token": os.getenv("GCP_ACCESS_TOKEN"),
+    },
+}
+
+# Number of concurrent API calls per workspace
+MAX_WORKERS = int(os.getenv("PARITY_MAX_WORKERS", "16"))
+REPORT_PATH = os.getenv("PARITY_REPORT_PATH", "parity_report.json")
+# Content hashes keyed by (workspace, path, modified_at), reused between runs
+HASH_CACHE_PATH = os.getenv("PARITY_HASH_CACHE_PATH", "parity_hash_cache.json")
+
+# Throttled (429) and unavailable (503) responses are retried with exponential backoff
+MAX_RETRIES = int(os.getenv("PARITY_MAX_RETRIES", "5"))
+RETRY_BACKOFF = float(os.getenv("PARITY_RETRY_BACKOFF", "1"))
+RETRY_STATUS_CODES = (429, 503)
+
+# Cluster settings compared between workspaces (ids, state and cloud-specific node types always differ)
+CLUSTER_FIELDS = ["spark_version", "num_workers", "autoscale", "spark_conf", "custom_tags"]
+
+
+def get_headers(token):
+    """Generate request headers."""
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
+
+
+def get_with_retry(url, headers, params=None):
+    """Send a GET request, backing off and retrying while the API throttles it."""
+    for attempt in range(MAX_RETRIES + 1):
+        response = requests.get(url, headers=headers, params=params)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+            return response
+        try:
+            delay = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            delay = RETRY_BACKOFF * 2 ** attempt
+        time.sleep(delay)
+
+
+def get_configured_workspaces():
+    """Return the workspaces that have both a URL and a token configured."""
+    return {
+        name: config
+        for name, config in WORKSPACE_CONFIG.items()
+        if config["url"] and config["token"]
+    }
+
+
+def record_error(errors, operation, target, error):
+    """Print an API failure and record it so the report can exclude the affected data."""
+    print(f"Error during {operation} of {target}: {error}")
+    errors.append({"operation": operation, "target": target, "error": str(error)})
+
+
+def list_directory(workspace_url, access_token, path, errors):
+    """List the objects directly inside a workspace directory, or None if the listing failed."""
+    api_endpoint = f"{workspace_url}/api/2.0/workspace/list"
+    try:
+        response = get_with_retry(api_endpoint, headers=get_headers(access_token), params={"path": path})
+        response.raise_for_status()
+        return response.json().get("objects", [])
+    except requests.exceptions.RequestException as e:
+        record_error(errors, "list", path, e)
+        return None
+
+
+def build_object_index(workspace_url, access_token, errors, root="/"):
+    """
+    Build an index of every workspace object keyed by path.
+    Directories at the same depth are listed concurrently.
+    Returns the index and the directories whose listing failed.
+    """
+    index = {}
+    failed_directories = []
+    pending = [root]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        while pending:
+            paths = pending
+            listings = executor.map(lambda path: list_directory(workspace_url, access_token, path, errors), paths)
+            pending = []
+            for path, objects in zip(paths, listings):
+                if objects is None:
+                    failed_directories.append(path)
+                    continue
+                for obj in objects:
+                    index[obj["path"]] = {
+                        "object_type": obj.get("object_type"),
+                        "object_id": obj.get("object_id"),
+                        "language": obj.get("language"),
+                        "size": obj.get("size"),
+                        "modified_at": obj.get("modified_at"),
+                        "hash": None,
+                    }
+                    if obj.get("object_type") == "DIRECTORY":
+                        pending.append(obj["path"])
+    return index, failed_directories
+
+
+def hash_object(workspace_url, access_token, path, errors):
+    """Export an object and return the SHA-256 hash of its source, or None if the export failed."""
+    api_endpoint = f"{workspace_url}/api/2.0/workspace/export"
+    try:
+        response = get_with_retry(
+            api_endpoint, headers=get_headers(access_token), params={"path": path, "format": "SOURCE"}
+        )
+        response.raise_for_status()
+        content = base64.b64decode(response.json().get("content", ""))
+        return hashlib.sha256(content).hexdigest()
+    except requests.exceptions.RequestException as e:
+        record_error(errors, "export", path, e)
+        return None
+
+
+def get_users(workspace_url, access_token, errors):
+    """Fetch all user names from a workspace, following SCIM pagination. Returns None if any page failed."""
+    api_endpoint = f"{workspace_url}/api/2.0/preview/scim/v2/Users"
+    users = set()
+    start_index = 1
+    try:
+        while True:
+            params = {"startIndex": start_index, "count": 100, "attributes": "userName"}
+            response = get_with_retry(api_endpoint, headers=get_headers(access_token), params=params)
+            response.raise_for_status()
+            body = response.json()
+            resources = body.get("Resources", [])
+            users.update(user["userName"] for user in resources)
+            start_index += len(resources)
+            if not resources or start_index > body.get("totalResults", 0):
+                return users
+    except requests.exceptions.RequestException as e:
+        record_error(errors, "list users", f"startIndex={start_index}", e)
+        return None
+
+
+def get_clusters(workspace_url, access_token, errors):
+    """Fetch cluster settings from a workspace, keyed by cluster name. Returns None if the listing failed."""
+    api_endpoint = f"{workspace_url}/api/2.0/clusters/list"
+    try:
+        response = get_with_retry(api_endpoint, headers=get_headers(access_token))
+        response.raise_for_status()
+        # Job and pipeline clusters are ephemeral and named per run, so only compare long-lived ones
+        return {
+            cluster["cluster_name"]: {field: cluster.get(field) for field in CLUSTER_FIELDS}
+            for cluster in response.json().get("clusters", [])
+            if cluster.get("cluster_source") in ("UI", "API")
+        }
+    except requests.exceptions.RequestException as e:
+        record_error(errors, "list clusters", workspace_url, e)
+        return None
+
+
+def get_directory_permissions(workspace_url, access_token, path, object_id, errors):
+    """Fetch the direct (non-inherited) ACL of a directory as a sorted list."""
+    api_endpoint = f"{workspace_url}/api/2.0/permissions/directories/{object_id}"
+    try:
+        response = get_with_retry(api_endpoint, headers=get_headers(access_token))
+        response.raise_for_status()
+        acl = []
+        for entry in response.json().get("access_control_list", []):
+            principal = entry.get("user_name") or entry.get("group_name") or entry.get("service_principal_name")
+            for permission in entry.get("all_permissions", []):
+                if not permission.get("inherited"):
+                    acl.append(f"{principal}:{permission['permission_level']}")
+        return sorted(acl)
+    except requests.exceptions.RequestException as e:
+        record_error(errors, "get permissions", path, e)
+        return None
+
+
+def snapshot_workspace(name, config):
+    """Collect users, objects, clusters and directory permissions for one workspace."""
+    print(f"Indexing workspace {name}...")
+    url, token = config["url"], config["token"]
+    errors = []
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        users = executor.submit(get_users, url, token, errors)
+        clusters = executor.submit(get_clusters, url, token, errors)
+        objects = executor.submit(build_object_index, url, token, errors)
+        index, failed_directories = objects.result()
+        snapshot = {
+            "users": users.result(),
+            "clusters": clusters.result(),
+            "objects": index,
+            "failed_directories": failed_directories,
+            "errors": errors,
+        }
+
+    directories = {
+        path: meta["object_id"]
+        for path, meta in snapshot["objects"].items()
+        if meta["object_type"] == "DIRECTORY" and meta["object_id"] is not None
+    }
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        acls = executor.map(
+            lambda item: get_directory_permissions(url, token, item[0], item[1], errors), directories.items()
+        )
+        snapshot["permissions"] = {
+            path: acl for path, acl in zip(directories.keys(), acls) if acl is not None
+        }
+
+    print(f"Indexed {len(snapshot['objects'])} objects in {name} with {len(errors)} errors.")
+    return snapshot
+
+
+def load_hash_cache(cache_path=HASH_CACHE_PATH):
+    """Load content hashes from a previous run, keyed by workspace and path."""
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_hash_cache(snapshots, cache_path=HASH_CACHE_PATH):
+    """Store the content hashes of this run together with the modified time they were computed for."""
+    cache = {
+        name: {
+            path: {"modified_at": meta["modified_at"], "hash": meta["hash"]}
+            for path, meta in snapshot["objects"].items()
+            if meta["hash"] is not None and meta["modified_at"] is not None
+        }
+        for name, snapshot in snapshots.items()
+    }
+    with open(cache_path, "w") as f:
+        json.dump(cache, f)
+
+
+def fill_content_hashes(workspaces, snapshots, paths, hash_cache):
+    """
+    Hash the notebooks and files that exist everywhere but cannot be told apart by size alone.
+    Objects whose sizes already differ are left unhashed.
+    Hashes from the cache are reused when the object's modified time is unchanged.
+    workspace/list only reports size for files, so notebooks always need a hash. On the first run
+    (or without modified_at) every common notebook is exported from each workspace.
+    Returns the paths whose export failed in at least one workspace.
+    """
+    jobs = []
+    for path in paths:
+        metas = [snapshots[name]["objects"][path] for name in snapshots]
+        if metas[0]["object_type"] == "DIRECTORY":
+            continue
+        sizes = {meta["size"] for meta in metas}
+        if len(sizes) > 1 and None not in sizes:
+            continue
+        for name in snapshots:
+            meta = snapshots[name]["objects"][path]
+            cached = hash_cache.get(name, {}).get(path)
+            if cached and meta["modified_at"] is not None and cached["modified_at"] == meta["modified_at"]:
+                meta["hash"] = cached["hash"]
+            else:
+                jobs.append((name, path))
+
+    def hash_job(job):
+        name, path = job
+        config = workspaces[name]
+        content_hash = hash_object(config["url"], config["token"], path, snapshots[name]["errors"])
+        snapshots[name]["objects"][path]["hash"] = content_hash
+        return path, content_hash is not None
+
+    print(f"Exporting {len(jobs)} objects to hash their content...")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS * len(snapshots)) as executor:
+        return {path for path, hashed in executor.map(hash_job, jobs) if not hashed}
+
+
+def is_under_directory(path, directories):
+    """Check whether a path is one of the directories or lies inside one of them."""
+    return any(path == directory or path.startswith(directory.rstrip("/") + "/") for directory in directories)
+
+
+def complete_snapshots(snapshots, key):
+    """Return the data under key for the workspaces where it was fetched without errors."""
+    return {name: snapshot[key] for name, snapshot in snapshots.items() if snapshot[key] is not None}
+
+
+def diff_presence(keys_by_workspace):
+    """Return the keys that are missing from at least one workspace."""
+    if len(keys_by_workspace) < 2:
+        return []
+    all_keys = set().union(*keys_by_workspace.values())
+    only_in_some = []
+    for key in sorted(all_keys):
+        present_in = [name for name, keys in keys_by_workspace.items() if key in keys]
+        if len(present_in) < len(keys_by_workspace):
+            only_in_some.append({
+                "key": key,
+                "present_in": present_in,
+                "missing_from": [name for name in keys_by_workspace if name not in present_in],
+            })
+    return only_in_some
+
+
+def diff_values(values_by_workspace, keys):
+    """Return the keys whose values are not identical across workspaces."""
+    differing = []
+    for key in sorted(keys):
+        values = {name: values[key] for name, values in values_by_workspace.items()}
+        if len({json.dumps(value, sort_keys=True) for value in values.values()}) > 1:
+            differing.append({"key": key, "values": values})
+    return differing
+
+
+def diff_objects(snapshots, common_paths):
+    """Compare object type, language, size and content hash for paths present everywhere."""
+    differing = []
+    for path in sorted(common_paths):
+        metas = {name: snapshot["objects"][path] for name, snapshot in snapshots.items()}
+        reasons = []
+        for field in ("object_type", "language", "size", "hash"):
+            values = {meta[field] for meta in metas.values() if meta[field] is not None}
+            if len(values) > 1:
+                reasons.append(field)
+        if reasons:
+            differing.append({
+                "key": path,
+                "differs_in": reasons,
+                "values": {
+                    name: {field: meta[field] for field in ("object_type", "language", "size", "modified_at", "hash")}
+                    for name, meta in metas.items()
+                },
+            })
+    return differing
+
+
+def build_parity_report(workspaces):
+    """Index all workspaces concurrently and compute the drift between them."""
+    with ThreadPoolExecutor(max_workers=len(workspaces)) as executor:
+        futures = {name: executor.submit(snapshot_workspace, name, config) for name, config in workspaces.items()}
+        snapshots = {name: future.result() for name, future in futures.items()}
+
+    # Paths inside a directory that failed to list anywhere cannot be compared
+    failed_directories = {path for snapshot in snapshots.values() for path in snapshot["failed_directories"]}
+    object_paths = {
+        name: {path for path in snapshot["objects"] if not is_under_directory(path, failed_directories)}
+        for name, snapshot in snapshots.items()
+    }
+    common_paths = set.intersection(*object_paths.values())
+    failed_hashes = fill_content_hashes(workspaces, snapshots, common_paths, load_hash_cache())
+    save_hash_cache(snapshots)
+
+    # Users and clusters are only compared between workspaces where they were fetched completely
+    users = complete_snapshots(snapshots, "users")
+    clusters = complete_snapshots(snapshots, "clusters")
+    cluster_names = {name: set(names) for name, names in clusters.items()}
+    permission_paths = {name: set(snapshot["permissions"]) for name, snapshot in snapshots.items()}
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "workspaces": list(workspaces),
+        "users": {
+            "only_in_some": diff_presence(users),
+        },
+        "notebooks": {
+            "only_in_some": diff_presence(object_paths),
+            "differing": diff_objects(snapshots, common_paths - failed_hashes),
+        },
+        "clusters": {
+            "only_in_some": diff_presence(cluster_names),
+            "differing": diff_values(
+                clusters, set.intersection(*cluster_names.values()) if len(clusters) > 1 else set()
+            ),
+        },
+        "permissions": {
+            "differing": diff_values(
+                {name: snapshot["permissions"] for name, snapshot in snapshots.items()},
+                set.intersection(*permission_paths.values()),
+            ),
+        },
+        "errors": {name: snapshot["errors"] for name, snapshot in snapshots.items()},
+    }
+    report["summary"] = {
+        category: {kind: len(entries) for kind, entries in sections.items()}
+        for category, sections in report.items()
+        if isinstance(sections, dict)
+    }
+    return report
+
+
+def check_parity(report_path=REPORT_PATH):
+    """Run the parity check across all configured workspaces and write the JSON report."""
+    workspaces = get_configured_workspaces()
+    if len(workspaces) < 2:
+        print("At least two workspaces must be configured to check parity.")
+        return None
+
+    print(f"Checking parity across workspaces: {', '.join(workspaces)}")
+    report = build_parity_report(workspaces)
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Parity report written to '{report_path}'.")
+    print(json.dumps(report["summary"], indent=4))
+    return report
+
+
+if __name__ == "__main__":
+    check_parity()